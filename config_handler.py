@@ -13,10 +13,44 @@
 # permissions and limitations under the License.
 
 """Handles reading and validating fields in the config file."""
+import os
 import json
 import logging
 from typing import Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CONFIG_PATH = "config.json"
+# Parsed config contents, keyed by the (mtime, size) of the file when read.
+_CONFIG_CACHE = {"stat": None, "data": None}
+
+_EXPECTED_TYPES: dict[str, type] = {
+    "dashboard_title": str,
+    "dashboard_favicon": str,
+    "covid_nation": str,
+    "covid_local": str,
+    "covid_update_interval_seconds": int,
+    "news_API_key": str,
+    "news_country_code": str,
+    "news_update_interval_seconds": int,
+    "news_search_terms": str
+}
+
+_DEFAULT_VALUES: dict[str, Any] = {
+    "dashboard_title": "COVID-19 Dashboard",
+    "dashboard_favicon": "https://i.ibb.co/7nYCWzN/Favicon.png",
+    "covid_nation": "England",
+    "covid_local": "Exeter",
+    "covid_update_interval_seconds": 86400,
+    "news_API_key": "",
+    "news_country_code": "gb",
+    "news_update_interval_seconds": 86400,
+    "news_search_terms": "Covid COVID-19 coronavirus"
+}
+
 
 def validate_field(field: str, value: Any) -> Any:
     """Type checks a given config field.
@@ -33,49 +67,49 @@ def validate_field(field: str, value: Any) -> Any:
         Either the value of the field or the default value of the
         field, depending on whether the value is of the expected type.
     """
-    expected_types = {
-        "dashboard_title": str,
-        "dashboard_favicon": str,
-        "covid_nation": str,
-        "covid_local": str,
-        "covid_update_interval_seconds": int,
-        "news_API_key": str,
-        "news_country_code": str,
-        "news_update_interval_seconds": int,
-        "news_search_terms": str
-    }
-
-    default_values = {
-        "dashboard_title": "COVID-19 Dashboard",
-        "dashboard_favicon": "https://i.ibb.co/7nYCWzN/Favicon.png",
-        "covid_nation": "England",
-        "covid_local": "Exeter",
-        "covid_update_interval_seconds": 86400,
-        "news_API_key": "",
-        "news_country_code": "gb",
-        "news_update_interval_seconds": 86400,
-        "news_search_terms": "Covid COVID-19 coronavirus"
-    }
-    if isinstance(value, expected_types[field]):
+    if isinstance(value, _EXPECTED_TYPES[field]):
         return value
 
     type_error_log = "Config field '%s' invalid type. %s should be: %s"
     actual = type(value).__name__
-    expected = expected_types[field].__name__
+    expected = _EXPECTED_TYPES[field].__name__
     logging.warning(type_error_log, field, actual, expected)
 
-    default_value = default_values[field]
+    default_value = _DEFAULT_VALUES[field]
     replace_log = "Invalid config value '%s' replaced with '%s'"
     logging.warning(replace_log, value, default_value)
     return default_value
 
 
+def load_config() -> dict[str, Any]:
+    """Returns the parsed contents of the config file.
+
+    The parsed config is cached and only re-read from disk when the
+    modification time or size of config.json changes. The config is
+    parsed with orjson if it is installed, otherwise with json.
+
+    Returns:
+        A dictionary containing every field in config.json.
+    """
+    stat = os.stat(CONFIG_PATH)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    if _CONFIG_CACHE["stat"] != stat_key:
+        with open(CONFIG_PATH, "rb") as config_file:
+            contents = config_file.read()
+        if orjson is not None:
+            _CONFIG_CACHE["data"] = orjson.loads(contents)
+        else:
+            _CONFIG_CACHE["data"] = json.loads(contents)
+        _CONFIG_CACHE["stat"] = stat_key
+    return _CONFIG_CACHE["data"]
+
 
 def read_config(*fields: str) -> list[str]:
     r"""Reads the config file for given fields.
 
-    Open config.json in the current directory and return the data in
-    the fields specified in the arguments.
+    Load config.json in the current directory and return the data in
+    the fields specified in the arguments. The file is only parsed
+    again if it has changed since it was last read.
 
     Args:
         *fields: Variable number of fields to return from config.json.
@@ -85,7 +119,5 @@ def read_config(*fields: str) -> list[str]:
         the fields argument, in the order that the fields were
         given in. Returns None for any fields with the wrong type.
     """
-    with open("config.json", "r", encoding="UTF-8") as config_file:
-        config = json.load(config_file)
-
+    config = load_config()
     return [validate_field(field, config[field]) for field in fields]
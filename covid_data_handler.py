@@ -17,16 +17,19 @@
 Requests and processes recent COVID data from the uk_covid19 API.
 Creation and deletion of scheduled updates is also implemented.
 """
-import time
-import sched
+import csv
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from uk_covid19 import Cov19API
 from config_handler import read_config
+from scheduler_handler import s, seconds_until, run_update
+from scheduler_handler import updates_lock, changed_updates
 
 covid_data = {}
+covid_summaries = {}
 covid_updates = {}
-s = sched.scheduler(time.time, time.sleep)
+# Incremented whenever the COVID data or updates change.
+data_version = 0
 
 
 def parse_csv_data(csv_filename: str) -> list[str]:
@@ -62,8 +65,9 @@ def read_csv_value(csv_row: str, column: int) -> int:
         >>> read_csv_value(row, 3)
         30
     """
-    value = csv_row.split(",")[column]
-    return int(value if value else 0)
+    # Stop splitting once the requested column has been reached.
+    value = csv_row.split(",", column + 1)[column]
+    return int(value or "0")
 
 
 def first_non_blank_cell(csv_lines: list[str], column: int) -> int:
@@ -87,7 +91,9 @@ def first_non_blank_cell(csv_lines: list[str], column: int) -> int:
         2
     """
     for i in range(1, len(csv_lines)):
-        if read_csv_value(csv_lines[i], column):
+        # Inline read_csv_value, as this runs once for every row.
+        value = csv_lines[i].split(",", column + 1)[column]
+        if value and int(value):
             return i
     return -1
 
@@ -108,26 +114,55 @@ def process_covid_csv_data(
         A tuple containing the cases in the last 7 days, the current
         hospital cases, and the total deaths.
     """
-    headers = covid_csv_data[0].split(",")
-    # Sum of last seven day's cases, excluding the most recent value.
-    column = headers.index("newCasesBySpecimenDate")
-    row = first_non_blank_cell(covid_csv_data, column) + 1
-    week = covid_csv_data[row:row+7]
-    week_cases = sum(read_csv_value(day, column) for day in week)
-
-    # Hospital Cases
-    column = headers.index("hospitalCases")
-    row = first_non_blank_cell(covid_csv_data, column)
-    hospital_cases = read_csv_value(covid_csv_data[row], column)
-
-    # Total Deaths
-    column = headers.index("cumDailyNsoDeathsByDeathDate")
-    row = first_non_blank_cell(covid_csv_data, column)
-    total_deaths = read_csv_value(covid_csv_data[row], column)
+    rows = csv.reader(covid_csv_data)
+    headers = next(rows)
+    cases_column = headers.index("newCasesBySpecimenDate")
+    hospital_column = headers.index("hospitalCases")
+    deaths_column = headers.index("cumDailyNsoDeathsByDeathDate")
+
+    # Read all three columns in a single pass over the rows.
+    week_days = None
+    week_cases = hospital_cases = total_deaths = 0
+    for row in rows:
+        # Sum of last seven day's cases, excluding the most recent value.
+        if week_days is None:
+            if row[cases_column] and int(row[cases_column]):
+                week_days = 0
+        elif week_days < 7:
+            week_cases += int(row[cases_column] or "0")
+            week_days += 1
+
+        if not hospital_cases:
+            hospital_cases = int(row[hospital_column] or "0")
+        if not total_deaths:
+            total_deaths = int(row[deaths_column] or "0")
+
+        if week_days == 7 and hospital_cases and total_deaths:
+            break
 
     return week_cases, hospital_cases, total_deaths
 
 
+def get_covid_summary(location: str) -> tuple[int, int, int]:
+    """Returns the summarised COVID data for a given area.
+
+    The summary is calculated when new data is requested for the area,
+    so the stored summary is normally returned without recalculating.
+
+    Args:
+        location: The name of an area with requested COVID data.
+
+    Returns:
+        A tuple containing the cases in the last 7 days, the current
+        hospital cases, and the total deaths.
+    """
+    summary = covid_summaries.get(location)
+    if summary is None:
+        summary = process_covid_csv_data(covid_data[location])
+        covid_summaries[location] = summary
+    return summary
+
+
 def covid_API_request(
         location: str = "Exeter",
         location_type: str = "ltla") -> dict[str]:
@@ -144,6 +179,7 @@ def covid_API_request(
         A dictionary containing a csv file containing COVID information
         for an area, indexed by the area's name.
     """
+    global data_version
     requested_area = ["areaType="+location_type, "areaName="+location]
     requested_data = {
         "areaCode": "areaCode",
@@ -158,12 +194,35 @@ def covid_API_request(
     logging.info("Requesting COVID data for %s...", location)
     api = Cov19API(filters=requested_area, structure=requested_data)
     data = api.get_csv()
-    covid_data[location] = data.split("\n")[:-1]
+    csv_lines = data.splitlines()
+    # Summarise the data once here, rather than when it is displayed,
+    # and before storing it, so malformed data leaves both unchanged.
+    summary = process_covid_csv_data(csv_lines)
+    covid_data[location] = csv_lines
+    covid_summaries[location] = summary
+    data_version += 1
     logging.info("COVID data for %s updated.", location)
     return covid_data
 
 
-def run_covid_update(update_name: str) -> None:
+def update_covid_data(ltla: str, nation: str) -> None:
+    """Requests current COVID data for a local area and a nation.
+
+    Both API requests are sent concurrently, as they are independent.
+
+    Args:
+        ltla: The lower tier local authority to request data for.
+        nation: The nation to request data for.
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(covid_API_request, ltla, "ltla"),
+            executor.submit(covid_API_request, nation, "nation")]
+    for future in futures:
+        future.result()
+
+
+def run_covid_update(update_name: str, update: dict) -> None:
     """Enacts a scheduled update and either repeats or deletes it.
 
     Updates COVID data for the area specified in config.json, and
@@ -172,20 +231,29 @@ def run_covid_update(update_name: str) -> None:
 
     Args:
         update_name: The identifier of the update.
+        update: The update which scheduled this run.
     """
+    global data_version
     nation, ltla, interval = read_config(
         "covid_nation", "covid_local", "covid_update_interval_seconds")
-    covid_API_request(location=ltla, location_type="ltla")
-    covid_API_request(location=nation, location_type="nation")
-
-    logging.info("COVID update '%s' completed.", update_name)
-    if covid_updates[update_name]["repeats"]:
-        schedule_covid_updates(interval, update_name)
-        repeat_log = "COVID update '%s' scheduled to repeat."
-        logging.info(repeat_log, update_name)
-    else:
-        covid_updates.pop(update_name)
-        logging.info("COVID update '%s' removed.", update_name)
+    try:
+        update_covid_data(ltla, nation)
+        logging.info("COVID update '%s' completed.", update_name)
+    finally:
+        # Repeat or remove the update even if the request failed, unless
+        # it was removed or replaced by a new update with the same name
+        # while the data was being requested.
+        with updates_lock:
+            if covid_updates.get(update_name) is update:
+                if update["repeats"]:
+                    schedule_covid_updates(interval, update_name)
+                    repeat_log = "COVID update '%s' scheduled to repeat."
+                    logging.info(repeat_log, update_name)
+                else:
+                    covid_updates.pop(update_name)
+                    changed_updates.add(update_name)
+                    logging.info("COVID update '%s' removed.", update_name)
+                data_version += 1
 
 
 def create_covid_update(
@@ -200,13 +268,15 @@ def create_covid_update(
         update_time: Time of the update in HH:MM.
         update_name: The identifier of the update.
         repeats: Either None or "repeat".
+
+    Raises:
+        ValueError: If the update time is not a valid time of day.
     """
+    # Calculate number of seconds until the update, before storing it.
+    seconds = seconds_until(update_time)
     update = {"time": update_time, "repeats": repeats}
     covid_updates[update_name] = update
-    # Calculate number of seconds until the update.
-    schedule_time = datetime.strptime(update_time, "%H:%M")
-    current_time = datetime.now()
-    seconds = (schedule_time - current_time).seconds
+    changed_updates.add(update_name)
     schedule_covid_updates(seconds, update_name)
 
     log_message = "%s COVID update '%s' created for %s."
@@ -227,7 +297,9 @@ def schedule_covid_updates(
     """
     if update_name not in covid_updates:
         covid_updates[update_name] = {"time": "None", "repeats": None}
+        changed_updates.add(update_name)
         logging.warning("Update not found, dummy update created.")
 
-    update = s.enter(update_interval, 1, run_covid_update, update_name)
-    covid_updates[update_name]["update"] = update
+    update = covid_updates[update_name]
+    arguments = (update, run_covid_update, update_name, update)
+    update["update"] = s.enter(update_interval, 1, run_update, arguments)
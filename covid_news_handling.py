@@ -18,18 +18,51 @@ Uses newsapi.org to request top headlines, and filters them based on
 search terms defined in the config file. Creation and deletion of
 scheduled updates is also implemented.
 """
-import time
-import sched
+import re
 import logging
-from datetime import datetime
+import functools
+from collections import OrderedDict
+from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
 from flask import Markup
 from config_handler import read_config
+from scheduler_handler import s, seconds_until, run_update
+from scheduler_handler import updates_lock, changed_updates
 
 news_articles = []
-blocked_articles = []
+news_titles = set()
+blocked_articles = set()
 news_updates = {}
-s = sched.scheduler(time.time, time.sleep)
+# Incremented whenever the news articles or updates change.
+data_version = 0
+# Formatted articles indexed by url, with the least recent first.
+formatted_articles = OrderedDict()
+FORMAT_CACHE_SIZE = 500
+# Most recent articles received from newsapi.org.
+last_api_articles = []
+
+# Reuse connections to newsapi.org between requests.
+REQUEST_TIMEOUT_SECONDS = 5
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+
+@functools.lru_cache(maxsize=8)
+def _compile_terms(search_terms: str) -> Optional[re.Pattern]:
+    """Compiles space separated search terms into a single regex.
+
+    Args:
+        search_terms: A space separated string of search terms.
+
+    Returns:
+        A case-insensitive pattern matching any of the search terms,
+        or None if there are no search terms.
+    """
+    terms = search_terms.split()
+    if not terms:
+        return None
+    return re.compile("|".join(map(re.escape, terms)), re.IGNORECASE)
 
 
 def filter_articles(
@@ -48,10 +81,13 @@ def filter_articles(
         A list containing only the articles with titles that contained
         a search term.
     """
+    pattern = _compile_terms(search_terms)
+    if pattern is None:
+        return []
+
     relevant_articles = []
     for article in articles:
-        title = article["title"].lower()
-        if any(term.lower() in title for term in search_terms.split()):
+        if pattern.search(article["title"]):
             relevant_articles.append(article)
     return relevant_articles
 
@@ -61,7 +97,8 @@ def news_API_request(
     """Requests recent filtered top headlines from newsapi.org.
 
     Sends an API request to newsapi.org, filter the articles by the
-    given terms and return the filtered articles.
+    given terms and return the filtered articles. If the request fails,
+    the articles from the last successful request are used instead.
 
     Args:
         covid_terms: Space separated terms to search news articles for.
@@ -75,15 +112,17 @@ def news_API_request(
 
     parameters = f"?country={country}&apiKey={api_key}"
     url = "https://newsapi.org/v2/top-headlines" + parameters
-    response = requests.get(url)
-
-    filtered_articles = []
     if api_key == "[API_KEY_HERE]":
         logging.critical("The news API key has not been set in config.json")
         raise ValueError("The news API key has not been set in config.json")
 
-    articles = response.json()['articles']
-    filtered_articles = filter_articles(articles, covid_terms)
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT_SECONDS)
+        last_api_articles[:] = response.json()['articles']
+    except (requests.RequestException, ValueError, KeyError):
+        logging.exception("News request failed, using previous articles.")
+
+    filtered_articles = filter_articles(last_api_articles, covid_terms)
 
     if len(filtered_articles) == 0:
         empty_article = {}
@@ -99,7 +138,8 @@ def format_article(article: dict[str]) -> dict[str]:
 
     Format an article for the data structure used on the website by
     removing unnecessary data, shortens the contents to 20 words and
-    adds a link to the article in the article's contents.
+    adds a link to the article in the article's contents. Articles
+    which have already been formatted are reused, based on their url.
 
     Args:
         article: The news article to format.
@@ -107,9 +147,15 @@ def format_article(article: dict[str]) -> dict[str]:
     Returns:
         The new shortened article.
     """
+    url_key = article.get("url")
+    if url_key in formatted_articles:
+        formatted_articles.move_to_end(url_key)
+        return formatted_articles[url_key]
+
     formatted_article = {}
     formatted_article["title"] = article["title"]
-    url = f"<a href='{article['url']}'>[Click Here]</a>"
+    # Placeholder articles have no url to link to.
+    url = f"<a href='{url_key}'>[Click Here]</a>" if url_key else ""
     if article["content"]:
         description = " ".join(article["content"].split()[:20])
         content = f"{description}... {url}"
@@ -117,10 +163,15 @@ def format_article(article: dict[str]) -> dict[str]:
     else:
         formatted_article["content"] = Markup(url)
 
+    if not url_key:
+        return formatted_article
+    formatted_articles[url_key] = formatted_article
+    if len(formatted_articles) > FORMAT_CACHE_SIZE:
+        formatted_articles.popitem(last=False)
     return formatted_article
 
 
-def update_news(update_name: str = None) -> None:
+def update_news(update_name: str = None, update: dict = None) -> None:
     """Updates a list of relevant articles with the news API.
 
     Gathers and formats recent top headlines, adds new unblocked
@@ -129,34 +180,46 @@ def update_news(update_name: str = None) -> None:
 
     Args:
         update_name (Optional): The identifier of the update.
+        update (Optional): The update which scheduled this run.
     """
+    global data_version
     search_terms, interval = read_config(
         "news_search_terms","news_update_interval_seconds")
-    api_articles = news_API_request(search_terms)
-
-    for article in api_articles:
-        formatted_article = format_article(article)
-        if formatted_article not in news_articles and \
-                formatted_article["title"] not in blocked_articles:
-            # As the article isn't repeated or blocked, it can be added
-            logging.info("Article '%s' added.", article['title'])
-            news_articles.append(formatted_article)
-
-    if update_name in news_updates:
-        # The current update belongs to a scheduled update, so either
-        # repeat or delete it depending on whether it is set to repeat.
-        logging.info("News update '%s' completed.", update_name)
-        if news_updates[update_name]["repeats"]:
-            schedule_news_updates(interval, update_name)
-            repeat_log = "News update '%s' scheduled to repeat."
-            logging.info(repeat_log, update_name)
+    try:
+        api_articles = news_API_request(search_terms)
+
+        for article in api_articles:
+            formatted_article = format_article(article)
+            if formatted_article["title"] not in news_titles and \
+                    formatted_article["title"] not in blocked_articles:
+                # As the article isn't repeated or blocked, it can be added
+                logging.info("Article '%s' added.", article['title'])
+                news_articles.append(formatted_article)
+                news_titles.add(formatted_article["title"])
+
+        if update_name:
+            logging.info("News update '%s' completed.", update_name)
         else:
-            news_updates.pop(update_name)
-            logging.info("News update '%s' removed.", update_name)
-    elif update_name:
-        logging.warning("Update '{update_name}' does not exist.")
-    else:
-        logging.info("News articles updated.")
+            logging.info("News articles updated.")
+    finally:
+        # Repeat or remove a scheduled update even if the request failed.
+        with updates_lock:
+            if update is not None and \
+                    news_updates.get(update_name) is update:
+                # The current update belongs to a scheduled update, so
+                # either repeat or delete it depending on whether it is
+                # set to repeat.
+                if update["repeats"]:
+                    schedule_news_updates(interval, update_name)
+                    repeat_log = "News update '%s' scheduled to repeat."
+                    logging.info(repeat_log, update_name)
+                else:
+                    news_updates.pop(update_name)
+                    changed_updates.add(update_name)
+                    logging.info("News update '%s' removed.", update_name)
+            elif update_name:
+                logging.warning("Update '%s' does not exist.", update_name)
+            data_version += 1
 
 
 def block_article(title: str) -> None:
@@ -168,10 +231,14 @@ def block_article(title: str) -> None:
     Args:
         title: The title of the article to block.
     """
-    blocked_articles.append(title)
+    global data_version
+    blocked_articles.add(title)
+    news_titles.discard(title)
     for index, article in enumerate(news_articles):
         if title == article["title"]:
             news_articles.pop(index)
+            break
+    data_version += 1
 
     logging.info("Article '%s' blocked.", title)
 
@@ -188,13 +255,16 @@ def create_news_update(
         update_time: Time of the update in HH:MM.
         update_name: The identifier of the update.
         repeats: Either None or "repeat".
+
+    Raises:
+        ValueError: If the update time is not a valid time of day.
     """
+    # An invalid time raises here, before the update is stored.
+    seconds = seconds_until(update_time)
     update = {"time": update_time, "repeats": repeats}
     news_updates[update_name] = update
+    changed_updates.add(update_name)
 
-    schedule_time = datetime.strptime(update_time, "%H:%M")
-    current_time = datetime.now()
-    seconds = (schedule_time - current_time).seconds
     schedule_news_updates(seconds, update_name)
 
     log_message = "%s news update '%s' created for %s."
@@ -215,7 +285,9 @@ def schedule_news_updates(
     """
     if update_name not in news_updates:
         news_updates[update_name] = {"time": "None", "repeats": None}
+        changed_updates.add(update_name)
         logging.warning("Update not found, dummy update created.")
 
-    update = s.enter(update_interval, 1, update_news, update_name)
-    news_updates[update_name]["update"] = update
+    update = news_updates[update_name]
+    arguments = (update, update_news, update_name, update)
+    update["update"] = s.enter(update_interval, 1, run_update, arguments)
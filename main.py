@@ -20,11 +20,12 @@ the user in the config file. Calls events to be handled such as
 scheduling of updates, removal of updates, and removal of news articles.
 """
 import logging
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request
 from config_handler import read_config
 import covid_data_handler as cdh
 import covid_news_handling as cnh
 import update_handler
+import scheduler_handler
 
 logging.basicConfig(
     level=logging.INFO,
@@ -34,12 +35,18 @@ logging.basicConfig(
     encoding='utf-8')
 
 app = Flask(__name__)
+# Incremented by events which change the updates shown on the dashboard.
+event_version = 0
+# The last rendered dashboard and the data versions it was rendered with.
+cached_dashboard = (None, "")
+title, favicon = read_config("dashboard_title", "dashboard_favicon")
 # Get initial COVID data.
 ltla, nation = read_config("covid_local", "covid_nation")
-cdh.covid_API_request(location=ltla, location_type="ltla")
-cdh.covid_API_request(location=nation, location_type="nation")
+cdh.update_covid_data(ltla, nation)
 # Get initial news articles.
 cnh.update_news()
+# Run scheduled updates in the background.
+scheduler_handler.start_scheduler()
 
 
 @app.route('/')
@@ -48,35 +55,41 @@ def index() -> str:
     """Handles events and renders recent news and COVID data.
 
     Checks URL parameters for events (creating and deleting updates,
-    and blocking news articles), runs the schedulers to check for any
-    scheduled updates, formats pending updates for the website,
+    and blocking news articles), formats pending updates for the website,
     refreshes COVID data and news articles, and renders the template
-    with the current data.
+    with the current data. If nothing has changed since the dashboard
+    was last rendered, the previously rendered dashboard is returned.
 
     Returns:
         The html template rendered with the most recent data."""
+    global event_version, cached_dashboard
     # Event Management
     if (sched_time := request.args.get("update")):
         update_handler.create_update(sched_time)
+        event_version += 1
     elif (update_name := request.args.get("update_item")):
         update_handler.remove_update(update_name)
+        event_version += 1
     elif (blocked_title := request.args.get("notif")):
         cnh.block_article(blocked_title)
 
-    # Run and format updates.
-    cdh.s.run(blocking=False)
-    cnh.s.run(blocking=False)
+    # Reuse the last render if no data has changed since.
+    version = (event_version, cdh.data_version, cnh.data_version)
+    if version == cached_dashboard[0]:
+        return cached_dashboard[1]
+
+    # Format updates.
     update_handler.format_updates()
 
     # Process COVID data.
-    l_7days_cases = cdh.process_covid_csv_data(cdh.covid_data[ltla])[0]
+    l_7days_cases = cdh.get_covid_summary(ltla)[0]
     n_7days_cases, n_hospital_cases, n_deaths = \
-        cdh.process_covid_csv_data(cdh.covid_data[nation])
+        cdh.get_covid_summary(nation)
 
-    return render_template(
+    dashboard = render_template(
         template_name_or_list='index.html',
-        title=read_config("dashboard_title")[0],
-        favicon=read_config("dashboard_favicon")[0],
+        title=title,
+        favicon=favicon,
         image="Favicon.png",
         location=ltla,
         local_7day_infections=l_7days_cases,
@@ -86,6 +99,61 @@ def index() -> str:
         deaths_total=f"Total Deaths: {str(n_deaths)}",
         news_articles=cnh.news_articles,
         updates=update_handler.updates)
+    cached_dashboard = (version, dashboard)
+    return dashboard
+
+
+@app.route('/state')
+def state() -> tuple[dict, dict]:
+    """Returns the current updates, COVID data and news as JSON.
+
+    Gathers everything shown on the dashboard in a single response, so
+    a client can poll one endpoint for all of the dashboard's data.
+
+    The response is sent with "Cache-Control: no-cache" so that
+    polling clients always see the latest data.
+
+    Returns:
+        A dictionary containing the formatted updates, the summarised
+        COVID data and the current news articles, along with the
+        response headers.
+    """
+    update_handler.format_updates()
+    l_7days_cases = cdh.get_covid_summary(ltla)[0]
+    n_7days_cases, n_hospital_cases, n_deaths = \
+        cdh.get_covid_summary(nation)
+
+    return {
+        "updates": [row._asdict() for row in update_handler.updates],
+        "covid": {
+            "location": ltla,
+            "local_7day_infections": l_7days_cases,
+            "nation_location": nation,
+            "national_7day_infections": n_7days_cases,
+            "hospital_cases": n_hospital_cases,
+            "deaths_total": n_deaths
+        },
+        "news": cnh.news_articles
+    }, {"Cache-Control": "no-cache"}
+
+
+@app.after_request
+def set_cache_control(response: Response) -> Response:
+    """Allows browsers to briefly cache the dashboard.
+
+    Only plain requests for the dashboard may be cached, as requests
+    with URL parameters create and remove updates or block articles.
+
+    Args:
+        response: The response to be sent to the browser.
+
+    Returns:
+        The response, with a Cache-Control header set if it is a plain
+        request for the dashboard.
+    """
+    if request.endpoint == "index" and not request.args:
+        response.cache_control.max_age = 30
+    return response
 
 
 if __name__ == "__main__":
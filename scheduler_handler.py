@@ -0,0 +1,153 @@
+# Copyright 2021 Charles Goldstraw
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied. See the License for the specific language governing
+# permissions and limitations under the License.
+
+"""Runs scheduled COVID and news updates in the background.
+
+Provides the scheduler shared by the COVID and news handlers, and runs
+it in a daemon thread so that updates happen on time without waiting
+for a request to the dashboard.
+"""
+import time
+import heapq
+import sched
+import logging
+import threading
+from typing import Any, Callable
+from datetime import datetime
+
+# Longest time to wait before checking for newly scheduled updates.
+POLL_INTERVAL_SECONDS = 1
+SECONDS_PER_DAY = 24 * 60 * 60
+
+s = sched.scheduler(time.time, time.sleep)
+# Held while changing or reading the scheduled COVID and news updates.
+updates_lock = threading.RLock()
+# Names of updates which have changed since they were last formatted.
+changed_updates = set()
+_scheduler_thread = None
+
+
+def seconds_until(update_time: str) -> int:
+    """Calculates the number of seconds until a time in HH:MM.
+
+    Args:
+        update_time: The time of day in HH:MM.
+
+    Returns:
+        The number of seconds until the next occurrence of the time,
+        which is tomorrow if the time has already passed today.
+
+    Raises:
+        ValueError: If the time is not a valid time of day in HH:MM.
+
+    Example:
+        >>> # At 12:00:00
+        >>> seconds_until("13:30")
+        5400
+    """
+    try:
+        hours, minutes = map(int, update_time.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid update time: {update_time}") from None
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"Invalid update time: {update_time}")
+
+    current_time = datetime.now()
+    schedule_seconds = hours * 3600 + minutes * 60
+    current_seconds = current_time.hour * 3600 \
+        + current_time.minute * 60 + current_time.second
+    return (schedule_seconds - current_seconds) % SECONDS_PER_DAY
+
+
+def run_update(update: dict, action: Callable, *args: Any) -> None:
+    """Runs a scheduled update, unless the update has been cancelled.
+
+    Args:
+        update: A dictionary containing update information.
+        action: The function which performs the update.
+        *args: Arguments to pass to the action.
+    """
+    if not update.get("cancelled"):
+        action(*args)
+
+
+def cancel_update(update: dict) -> None:
+    """Cancels the next scheduled event of an update.
+
+    The update is marked as cancelled rather than searching the
+    scheduler's queue for its event, so the event does nothing when
+    it is due.
+
+    Args:
+        update: A dictionary containing update information.
+    """
+    update["cancelled"] = True
+
+
+def remove_events(events: list[sched.Event]) -> None:
+    """Removes several events from the scheduler's queue at once.
+
+    Rebuilds the queue in a single pass, rather than searching the
+    queue separately for each event as sched.scheduler.cancel does.
+
+    Args:
+        events: The scheduled events to remove.
+    """
+    event_ids = {id(event) for event in events}
+    with s._lock:
+        s._queue[:] = [e for e in s._queue if id(e) not in event_ids]
+        heapq.heapify(s._queue)
+
+
+def run_scheduler(
+        scheduler: sched.scheduler = s,
+        stop_event: threading.Event = None) -> None:
+    """Runs due scheduled updates until the program exits.
+
+    Runs any updates which are due, then sleeps until the next update
+    is due, waking at least every POLL_INTERVAL_SECONDS to pick up any
+    updates scheduled in the meantime. An update which fails is logged
+    and does not stop later updates from running.
+
+    Args:
+        scheduler (Optional): The scheduler to run, the shared
+            scheduler by default.
+        stop_event (Optional): An event which stops the scheduler
+            when set. Runs until the program exits if not given.
+    """
+    if stop_event is None:
+        stop_event = threading.Event()
+    while not stop_event.is_set():
+        try:
+            delay = scheduler.run(blocking=False)
+        except Exception:
+            logging.exception("Scheduled update failed.")
+            continue
+        if delay is None:
+            delay = POLL_INTERVAL_SECONDS
+        stop_event.wait(min(delay, POLL_INTERVAL_SECONDS))
+
+
+def start_scheduler() -> None:
+    """Starts running the scheduler in a background thread.
+
+    Only one scheduler thread is started, regardless of how many
+    times this is called.
+    """
+    global _scheduler_thread
+    if _scheduler_thread is None:
+        _scheduler_thread = threading.Thread(
+            target=run_scheduler, name="scheduler", daemon=True)
+        _scheduler_thread.start()
+        logging.info("Update scheduler started.")
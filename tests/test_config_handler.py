@@ -1,6 +1,34 @@
+import config_handler
 from config_handler import read_config
+from config_handler import load_config
 
 
 def test_read_config():
     data = read_config("news_API_key", "covid_nation", "covid_local")
     assert len(data) == 3
+
+
+def use_config(tmp_path, monkeypatch, contents):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(contents)
+    monkeypatch.setattr(config_handler, "CONFIG_PATH", str(config_path))
+    empty_cache = {"stat": None, "data": None}
+    monkeypatch.setattr(config_handler, "_CONFIG_CACHE", empty_cache)
+    return config_path
+
+
+def test_load_config(tmp_path, monkeypatch):
+    config_path = use_config(
+        tmp_path, monkeypatch, '{"covid_local": "Exeter"}')
+    config = load_config()
+    assert config == {"covid_local": "Exeter"}
+    assert load_config() is config
+
+    config_path.write_text('{"covid_local": "Plymouth"}')
+    assert load_config() == {"covid_local": "Plymouth"}
+
+
+def test_load_config_without_orjson(tmp_path, monkeypatch):
+    use_config(tmp_path, monkeypatch, '{"covid_local": "Exeter"}')
+    monkeypatch.setattr(config_handler, "orjson", None)
+    assert load_config() == {"covid_local": "Exeter"}
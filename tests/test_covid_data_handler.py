@@ -1,8 +1,14 @@
+import pytest
+import covid_data_handler
 from covid_data_handler import parse_csv_data
 from covid_data_handler import read_csv_value
 from covid_data_handler import first_non_blank_cell
 from covid_data_handler import process_covid_csv_data
+from covid_data_handler import get_covid_summary
+from covid_data_handler import covid_data
 from covid_data_handler import covid_API_request
+from covid_data_handler import covid_updates
+from covid_data_handler import run_covid_update
 from covid_data_handler import create_covid_update
 from covid_data_handler import schedule_covid_updates
 
@@ -38,6 +44,13 @@ def test_process_covid_csv_data():
     assert total_deaths == 141_544
 
 
+def test_get_covid_summary():
+    covid_data["Test"] = parse_csv_data('nation_2021-10-28.csv')
+    summary = get_covid_summary("Test")
+    assert summary == (240_299, 7_019, 141_544)
+    assert get_covid_summary("Test") is summary
+
+
 def test_covid_API_request():
     data = covid_API_request()
     assert isinstance(data, dict)
@@ -56,3 +69,27 @@ def test_create_covid_update():
 def test_schedule_covid_updates():
     schedule_covid_updates(
         update_interval=10, update_name='update test')
+
+
+def test_run_covid_update_replaced(monkeypatch):
+    monkeypatch.setattr(
+        covid_data_handler, "update_covid_data", lambda ltla, nation: None)
+    create_covid_update("00:00", "Replaced", None)
+    old_update = covid_updates.pop("Replaced")
+    create_covid_update("00:00", "Replaced", None)
+    new_update = covid_updates["Replaced"]
+    run_covid_update("Replaced", old_update)
+    assert covid_updates["Replaced"] is new_update
+    covid_updates.pop("Replaced")
+
+
+def test_run_covid_update_failed(monkeypatch):
+    def fail(*args):
+        raise ValueError("Request failed")
+
+    monkeypatch.setattr(covid_data_handler, "update_covid_data", fail)
+    create_covid_update("00:00", "Failed", None)
+    update = covid_updates["Failed"]
+    with pytest.raises(ValueError):
+        run_covid_update("Failed", update)
+    assert "Failed" not in covid_updates
@@ -1,7 +1,10 @@
+import pytest
+import covid_news_handling
 from covid_news_handling import filter_articles
 from covid_news_handling import news_API_request
 from covid_news_handling import format_article
 from covid_news_handling import update_news
+from covid_news_handling import news_updates
 from covid_news_handling import create_news_update
 from covid_news_handling import schedule_news_updates
 
@@ -14,6 +17,8 @@ def test_filter_articles():
     assert len(filter_articles(articles, "Important")) == 1
     assert len(filter_articles(articles, "Article")) == 2
     assert len(filter_articles(articles, "Irrelevant Important")) == 2
+    assert len(filter_articles(articles, "iMPORTANT")) == 1
+    assert len(filter_articles(articles, "")) == 0
 
 
 def test_news_API_request():
@@ -31,6 +36,12 @@ def test_format_article():
     article["content"] = "Test "*50
     formatted_content = format_article(article)["content"].split()
     assert len(formatted_content) <= 25
+    assert format_article(article) is format_article(article)
+
+
+def test_format_placeholder_article():
+    article = {"title": "No relevant articles currently", "content": ""}
+    assert format_article(article)["content"] == ""
 
 
 def test_update_news():
@@ -44,3 +55,27 @@ def test_create_news_update():
 def test_schedule_news_updates():
     schedule_news_updates(
         update_interval=10, update_name='update test')
+
+
+def test_update_news_replaced(monkeypatch):
+    monkeypatch.setattr(
+        covid_news_handling, "news_API_request", lambda terms: [])
+    create_news_update("00:00", "Replaced", None)
+    old_update = news_updates.pop("Replaced")
+    create_news_update("00:00", "Replaced", None)
+    new_update = news_updates["Replaced"]
+    update_news("Replaced", old_update)
+    assert news_updates["Replaced"] is new_update
+    news_updates.pop("Replaced")
+
+
+def test_update_news_failed(monkeypatch):
+    def fail(*args):
+        raise ValueError("Request failed")
+
+    monkeypatch.setattr(covid_news_handling, "news_API_request", fail)
+    create_news_update("00:00", "Failed", None)
+    update = news_updates["Failed"]
+    with pytest.raises(ValueError):
+        update_news("Failed", update)
+    assert "Failed" not in news_updates
@@ -0,0 +1,61 @@
+import time
+import sched
+import threading
+from datetime import datetime
+import pytest
+import scheduler_handler
+from scheduler_handler import run_scheduler
+from scheduler_handler import seconds_until
+from scheduler_handler import run_update
+from scheduler_handler import cancel_update
+
+
+def test_run_scheduler():
+    def fail():
+        raise RuntimeError("Update failed")
+
+    ran = []
+    scheduler = sched.scheduler(time.time, time.sleep)
+    scheduler.enter(0, 1, fail)
+    scheduler.enter(0, 2, ran.append, ("update",))
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=run_scheduler, args=(scheduler, stop_event), daemon=True)
+    thread.start()
+    for _ in range(30):
+        if ran:
+            break
+        time.sleep(0.1)
+    assert ran == ["update"]
+    assert thread.is_alive()
+
+    stop_event.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_seconds_until(monkeypatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2021, 1, 1, 12, 0, 0)
+
+    monkeypatch.setattr(scheduler_handler, "datetime", FixedDatetime)
+    assert seconds_until("13:30") == 5400
+    assert seconds_until("11:00") == 82800
+    assert seconds_until("12:00") == 0
+
+
+def test_seconds_until_invalid_time():
+    for update_time in ("24:00", "12:60", "-1:00", "noon"):
+        with pytest.raises(ValueError):
+            seconds_until(update_time)
+
+
+def test_run_update():
+    ran = []
+    update = {"time": "00:00", "repeats": None}
+    run_update(update, ran.append, "first")
+    cancel_update(update)
+    run_update(update, ran.append, "second")
+    assert ran == ["first"]
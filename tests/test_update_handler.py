@@ -1,4 +1,13 @@
+from types import SimpleNamespace
+import covid_data_handler as cdh
+import covid_news_handling as cnh
+import update_handler
 from update_handler import format_update
+from update_handler import format_updates
+from update_handler import create_update
+from update_handler import remove_update
+from update_handler import clear_updates
+from scheduler_handler import s
 
 
 def test_format_update():
@@ -9,4 +18,45 @@ def test_format_update():
     update = {"time": "12:34", "repeats": None}
     formatted = "12:34, Updates News, Doesn't Repeat"
     assert format_update(update, False, True) == formatted
-    
+
+
+def test_format_updates():
+    cdh.create_covid_update("01:23", "Both", "repeat")
+    cnh.create_news_update("01:23", "Both", "repeat")
+    cnh.create_news_update("12:34", "News", None)
+    format_updates()
+    contents = {u.title: u.content for u in update_handler.updates}
+    assert contents["Both"] == "01:23, Updates Covid & News, Repeats"
+    assert contents["News"] == "12:34, Updates News, Doesn't Repeat"
+
+    remove_update("News")
+    format_updates()
+    titles = [u.title for u in update_handler.updates]
+    assert "News" not in titles
+    assert "Both" in titles
+    remove_update("Both")
+
+
+def test_clear_updates():
+    cdh.create_covid_update("00:00", "Clear", None)
+    cnh.create_news_update("00:00", "Clear", None)
+    cnh.create_news_update("00:00", "Keep", None)
+    events = [cdh.covid_updates["Clear"]["update"],
+              cnh.news_updates["Clear"]["update"]]
+    clear_updates(["Clear"])
+    assert "Clear" not in cdh.covid_updates
+    assert "Clear" not in cnh.news_updates
+    assert "Keep" in cnh.news_updates
+    queued = [id(event) for event in s.queue]
+    assert id(events[0]) not in queued and id(events[1]) not in queued
+    clear_updates()
+    assert not cdh.covid_updates and not cnh.news_updates
+
+
+def test_create_update_invalid_time(monkeypatch):
+    args = {"two": "Ghost", "covid-data": "on", "news": "on"}
+    monkeypatch.setattr(
+        update_handler, "request", SimpleNamespace(args=args))
+    create_update("25:00")
+    assert "Ghost" not in cdh.covid_updates
+    assert "Ghost" not in cnh.news_updates
@@ -19,11 +19,31 @@ the website. Also adds and removes updates from these lists after
 user events from the dashboard.
 """
 import logging
+from collections import namedtuple
+from typing import Iterable, Optional
 from flask import request
 import covid_data_handler as cdh
 import covid_news_handling as cnh
+from scheduler_handler import updates_lock, changed_updates
+from scheduler_handler import cancel_update, remove_events
+
+log = logging.getLogger(__name__)
+
+# Descriptions of the data updated, indexed by (covid, news).
+UPDATED_DATA = {
+    (True, True): "Updates Covid & News",
+    (True, False): "Updates Covid",
+    (False, True): "Updates News",
+    (False, False): "Updates "
+}
+REPEATS = ("Doesn't Repeat", "Repeats")
+
+# An update as shown on the website.
+UpdateRow = namedtuple("UpdateRow", "title content")
 
 updates = []
+# The formatted updates in the updates list, indexed by name.
+update_rows = {}
 
 
 def format_update(update: dict[str], covid: bool, news: bool) -> str:
@@ -47,14 +67,27 @@ def format_update(update: dict[str], covid: bool, news: bool) -> str:
         >>> format_update(update, False, True)
         "12:34, Updates News, Doesn't Repeat"
     """
-    data = [update["time"]]
-    # Make list of items being updated, to be joined with "&".
-    updated_data = ["Covid"*covid, "News"*news]
-    updated_data = filter(None, updated_data)
-    # Gives "Updates Covid", "Updates News", or "Updates Covid & News"
-    data.append("Updates " + " & ".join(updated_data))
-    data.append("Repeats" if update["repeats"] else "Doesn't Repeat")
-    return ", ".join(data)
+    updated_data = UPDATED_DATA[(bool(covid), bool(news))]
+    repeats = REPEATS[bool(update["repeats"])]
+    return f'{update["time"]}, {updated_data}, {repeats}'
+
+
+def format_update_row(name: str) -> Optional[UpdateRow]:
+    """Formats an update for the list of updates on the website.
+
+    Args:
+        name: The identifier of the update.
+
+    Returns:
+        A named tuple containing the title and content of the update,
+        or None if there is no update with the given name.
+    """
+    covid = name in cdh.covid_updates
+    news = name in cnh.news_updates
+    if not covid and not news:
+        return None
+    update = cdh.covid_updates[name] if covid else cnh.news_updates[name]
+    return UpdateRow(name, format_update(update, covid, news))
 
 
 def format_updates() -> None:
@@ -62,16 +95,37 @@ def format_updates() -> None:
 
     Convert the separate update dictionaries into a formatted list
     of updates with titles and contents for the website to render.
+    Only updates which have changed since the last call are formatted
+    again, and the list is left as it is if no updates have changed.
     """
-    updates.clear()
-    all_updates = {**cdh.covid_updates, **cnh.news_updates}
-    for name, update in all_updates.items():
-        if name not in updates:
-            is_covid = name in cdh.covid_updates
-            is_news = name in cnh.news_updates
-            content = format_update(update, is_covid, is_news)
-            update = {"title": name, "content": content}
-            updates.append(update)
+    global updates
+    covid_updates = cdh.covid_updates
+    news_updates = cnh.news_updates
+    with updates_lock:
+        if not changed_updates:
+            return
+        for name in changed_updates:
+            row = format_update_row(name)
+            if row is None:
+                update_rows.pop(name, None)
+            else:
+                update_rows[name] = row
+        changed_updates.clear()
+
+        # Allocate the list once, as the most updates possible is known.
+        rows = [None] * (len(covid_updates) + len(news_updates))
+        i = 0
+        # Updates for both COVID data and news are listed with COVID updates.
+        for name in covid_updates:
+            rows[i] = update_rows[name]
+            i += 1
+        for name in news_updates:
+            if name not in covid_updates:
+                rows[i] = update_rows[name]
+                i += 1
+        del rows[i:]
+        # Replace the list in one step, so readers never see it part built.
+        updates = rows
 
 
 def create_update(sched_time: str) -> None:
@@ -83,20 +137,27 @@ def create_update(sched_time: str) -> None:
     Args:
         sched_time: The time of the update in HH:MM format.
     """
-    name = request.args.get("two")
-    update_covid = request.args.get("covid-data")
-    update_news = request.args.get("news")
-    repeats = request.args.get("repeat")
-    # Ensure unique name
-    if name not in {**cdh.covid_updates, **cnh.news_updates}:
-        if update_covid:
-            cdh.create_covid_update(sched_time, name, repeats)
-        if update_news:
-            cnh.create_news_update(sched_time, name, repeats)
-        if not update_covid and not update_news:
-            logging.warning("Empty update created, request ignored.")
-    else:
-        logging.warning("Update name already exists.")
+    covid_updates = cdh.covid_updates
+    news_updates = cnh.news_updates
+    args = request.args
+    name = args.get("two")
+    update_covid = args.get("covid-data")
+    update_news = args.get("news")
+    repeats = args.get("repeat")
+    with updates_lock:
+        # Ensure unique name
+        if name not in covid_updates and name not in news_updates:
+            try:
+                if update_covid:
+                    cdh.create_covid_update(sched_time, name, repeats)
+                if update_news:
+                    cnh.create_news_update(sched_time, name, repeats)
+            except ValueError:
+                log.warning("Invalid update time, request ignored.")
+            if not update_covid and not update_news:
+                log.warning("Empty update created, request ignored.")
+        else:
+            log.warning("Update name already exists.")
 
 
 def remove_update(name: str) -> None:
@@ -104,16 +165,54 @@ def remove_update(name: str) -> None:
 
     Removes an update, specified by its name, by cancelling the next
     scheduled event and removing the update from the dictionaries.
+    Cancelled events stay in the scheduler, but do nothing when due.
 
     Args:
         name: The identifier of the update.
     """
-    if name in cdh.covid_updates:
-        cdh.s.cancel(cdh.covid_updates[name]["update"])
-        cdh.covid_updates.pop(name)
-        logging.info("COVID update '%s' removed.", name)
-
-    if name in cnh.news_updates:
-        cnh.s.cancel(cnh.news_updates[name]["update"])
-        cnh.news_updates.pop(name)
-        logging.info("News update '%s' removed.", name)
+    covid_updates = cdh.covid_updates
+    news_updates = cnh.news_updates
+    log_removal = log.isEnabledFor(logging.INFO)
+    with updates_lock:
+        update = covid_updates.pop(name, None)
+        if update is not None:
+            cancel_update(update)
+            if log_removal:
+                log.info("COVID update '%s' removed.", name)
+
+        update = news_updates.pop(name, None)
+        if update is not None:
+            cancel_update(update)
+            if log_removal:
+                log.info("News update '%s' removed.", name)
+
+        changed_updates.add(name)
+
+
+def clear_updates(names: Iterable[str] = None) -> None:
+    """Removes several COVID and news updates at once.
+
+    Cancels the updates, removes them from the dictionaries and removes
+    all of their scheduled events in a single pass over the scheduler.
+
+    Args:
+        names (Optional): The identifiers of the updates to remove.
+            Every update is removed if no names are given.
+    """
+    covid_updates = cdh.covid_updates
+    news_updates = cnh.news_updates
+    with updates_lock:
+        if names is None:
+            names = [*covid_updates, *news_updates]
+
+        events = []
+        for name in names:
+            for scheduled in (covid_updates, news_updates):
+                update = scheduled.pop(name, None)
+                if update is not None:
+                    cancel_update(update)
+                    events.append(update["update"])
+            changed_updates.add(name)
+
+        remove_events(events)
+        log.info("%s scheduled events removed.", len(events))